@@ -3,8 +3,9 @@
 # FILTERS: Only businesses with real websites (no blank, localsearch, yellowpages URLs)
 # Copy this entire file into a Jupyter cell and run
 
-import time, re, random, os, json, hashlib
+import time, re, random, os, json, asyncio, threading
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
@@ -12,10 +13,13 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
+from lxml import html as lh
 import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.worksheet.datavalidation import DataValidation
+import xxhash
+try: import python_calamine; XLSX_ENGINE = "calamine"  # Rust xlsx reader, much faster than openpyxl
+except ImportError: XLSX_ENGINE = "openpyxl"
+import xlsxwriter
+import httpx
 
 # ============== CONFIG ==============
 NICHE_KEY = "safety"
@@ -55,8 +59,11 @@ OUTPUT_DIR = "exports_safety"
 MAX_PAGES = 5
 FETCH_EMAILS = True
 HEADLESS = False
-MIN_DELAY, MAX_DELAY = 4, 8
-PAGE_DELAY, LISTING_DELAY = 12, 3
+MIN_DELAY, MAX_DELAY = 4, 8  # Detail-page pacing floor + jitter; AdaptiveLimiter backs off from here on blocks
+PAGE_DELAY = 12  # Results-page pacing floor (+5s jitter) - YP watches this rate most closely
+EMAIL_CONCURRENCY = 8  # Parallel company-site fetches over HTTP
+BLOCK_RETRIES = 3  # Backed-off retries of a blocked results page before giving up on the search
+NUM_WORKERS = 4  # Parallel Chrome sessions in RUN_ALL (keep 3-6 to stay under YP anti-bot limits)
 
 USER_AGENTS = [
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 Chrome/121.0.0.0 Safari/537.36",
@@ -64,31 +71,39 @@ USER_AGENTS = [
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 Version/17.2 Safari/605.1.15",
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:122.0) Gecko/20100101 Firefox/122.0",
 ]
+STATUS_OPTIONS = ["Not Contacted","Contacted","Interested","Not Interested","Closed Won","Closed Lost"]
 EMAIL_BLACKLIST = ['example.com','domain.com','sentry.io','schema.org','wixpress','googleapis','yellowpages','.png','.jpg','.css','.js']
+MAILTO_RE = re.compile(r'href=["\']mailto:([^"\'<>?\s]+)', re.IGNORECASE)
+EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+BLACKLIST_RE = re.compile('|'.join(map(re.escape, EMAIL_BLACKLIST)))
 
 # ============== WEBSITE FILTER ==============
+_INVALID_RE = re.compile(r'localsearch\.com|yellowpages\.com|yp\.com|superpages\.com|whitepages\.com|manta\.com|yelp\.com')
+
 def is_valid_website(url):
     """Filter out blank, localsearch, and yellowpages URLs - we only want real business websites"""
-    if not url or not url.strip():
-        return False
-    url_lower = url.lower().strip()
-    invalid_patterns = [
-        'localsearch.com',
-        'yellowpages.com',
-        'yp.com',
-        'superpages.com',
-        'whitepages.com',
-        'manta.com',
-        'yelp.com',
-    ]
-    return not any(pattern in url_lower for pattern in invalid_patterns)
+    return bool(url and url.strip()) and _INVALID_RE.search(url.lower()) is None
+
+def valid_website_mask(urls):
+    """Vectorized is_valid_website over a column of URLs"""
+    urls = urls.fillna("").astype(str)
+    return (urls.str.strip() != "") & ~urls.str.lower().str.contains(_INVALID_RE, na=False)
 
 # ============== HELPERS ==============
 def ensure_dir():
     if not os.path.exists(OUTPUT_DIR): os.makedirs(OUTPUT_DIR)
 
+def lead_ids(names, phones):
+    """Vectorized name|phone keys -> list of 64-bit lead IDs (same hash as gen_id)"""
+    keys = names.fillna("").astype(str).str.lower().str.strip() + "|" + phones.fillna("").astype(str).str.strip()
+    return [xxhash.xxh3_64_intdigest(k.encode()) for k in keys]
+
+def lead_keys(names, phones):
+    return set(lead_ids(names, phones))
+
 def gen_id(name, phone):
-    return hashlib.md5(f"{str(name).lower().strip()}|{str(phone).strip()}".encode()).hexdigest()[:12]
+    name = "" if pd.isna(name) else str(name); phone = "" if pd.isna(phone) else str(phone)
+    return xxhash.xxh3_64_intdigest(f"{name.lower().strip()}|{phone.strip()}".encode())
 
 def load_all_ids():
     ids = set()
@@ -96,11 +111,13 @@ def load_all_ids():
         for f in os.listdir(OUTPUT_DIR):
             if f.endswith(".xlsx"):
                 try:
-                    df = pd.read_excel(os.path.join(OUTPUT_DIR, f))
-                    ids.update(gen_id(r.get("Company Name",""), r.get("Phone Number","")) for _,r in df.iterrows())
+                    df = pd.read_excel(os.path.join(OUTPUT_DIR, f), usecols=["Company Name","Phone"], dtype=str, engine=XLSX_ENGINE)
+                    ids |= lead_keys(df["Company Name"], df["Phone"])
                 except: pass
     return ids
 
+_DRIVER_PATH = ChromeDriverManager().install()  # Resolved once, not per browser
+
 def create_driver():
     opts = Options()
     if HEADLESS: opts.add_argument("--headless=new")
@@ -110,12 +127,58 @@ def create_driver():
     opts.add_argument(f"user-agent={random.choice(USER_AGENTS)}")
     opts.add_experimental_option("excludeSwitches", ["enable-automation"])
     opts.add_experimental_option('useAutomationExtension', False)
-    d = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=opts)
+    d = webdriver.Chrome(service=Service(_DRIVER_PATH), options=opts)
     d.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
     return d
 
+def wait_for(driver, css, timeout=10):
+    """Return as soon as `css` is in the DOM (or after timeout) instead of a fixed sleep"""
+    try: WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.CSS_SELECTOR, css))); return True
+    except: return False
+
+def wait_for_results(driver):
+    return wait_for(driver, ".result, .no-results", 15)
+
+# Phrases from YP/Cloudflare block pages only - a bare "blocked" also matches e.g. "pop-up blocked" notices
+BLOCK_MARKERS = ("you have been blocked", "access denied", "too many requests", "error 1020")
+
+def is_blocked(src):
+    low = src.lower()
+    return any(m in low for m in BLOCK_MARKERS) or ("cloudflare" in low and "ray id" in low)
+
+class AdaptiveLimiter:
+    """Request pacing that starts at min_delay, doubles on a block and halves (never below min_delay) after 20 clean requests"""
+    def __init__(self, min_delay=MIN_DELAY, max_delay=120, jitter=MAX_DELAY - MIN_DELAY):
+        self.min_delay, self.max_delay, self.jitter = min_delay, max_delay, jitter
+        self.delay = min_delay; self.streak = 0
+    def wait(self):
+        time.sleep(random.uniform(self.delay, self.delay + self.jitter))
+    def ok(self):
+        self.streak += 1
+        if self.streak >= 20: self.delay = max(self.min_delay, self.delay / 2); self.streak = 0
+    def blocked(self):
+        self.delay = min(self.max_delay, self.delay * 2); self.streak = 0
+
+_worker = threading.local()
+
+def get_limiter(kind="detail"):
+    """This worker thread's "page" or "detail" limiter - kept across searches so a backoff carries into the next one"""
+    if not hasattr(_worker, "limiters"):
+        _worker.limiters = {"page": AdaptiveLimiter(PAGE_DELAY, jitter=5), "detail": AdaptiveLimiter()}
+    return _worker.limiters[kind]
+
+def rotate_session(driver):
+    """Fresh cookies/cache/UA between pages without a Chrome cold start (False = session is gone)"""
+    try: driver.delete_all_cookies()
+    except: return False
+    try:
+        driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+        driver.execute_cdp_cmd('Network.setUserAgentOverride', {'userAgent': random.choice(USER_AGENTS)})
+    except: pass
+    return True
+
 def valid_email(e):
-    return e and '@' in e and not any(x in e.lower() for x in EMAIL_BLACKLIST)
+    return bool(e) and '@' in e and not BLACKLIST_RE.search(e.lower())
 
 def get_email_from_site(driver, url):
     if not url or not is_valid_website(url): return ""
@@ -124,133 +187,276 @@ def get_email_from_site(driver, url):
         driver.set_page_load_timeout(15)
         try: driver.get(url)
         except: return ""
-        time.sleep(2); src = driver.page_source
-        m = re.search(r'href=["\']mailto:([^"\'<>?\s]+)', src, re.IGNORECASE)
+        wait_for(driver, "a[href^='mailto:'], body", 5); src = driver.page_source
+        m = MAILTO_RE.search(src)
         if m and valid_email(m.group(1)): return m.group(1).strip()
-        for e in re.findall(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', src):
+        for e in EMAIL_RE.findall(src):
             if valid_email(e): return e
         for p in ['/contact','/contact-us','/about']:
             try:
-                driver.get(url.rstrip('/') + p); time.sleep(1.5); src = driver.page_source
-                m = re.search(r'href=["\']mailto:([^"\'<>?\s]+)', src, re.IGNORECASE)
+                driver.get(url.rstrip('/') + p); wait_for(driver, "a[href^='mailto:'], body", 3); src = driver.page_source
+                m = MAILTO_RE.search(src)
                 if m and valid_email(m.group(1)): return m.group(1).strip()
-                for e in re.findall(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', src):
+                for e in EMAIL_RE.findall(src):
                     if valid_email(e): return e
             except: pass
     except: pass
     return ""
 
+def find_email(src):
+    m = MAILTO_RE.search(src)
+    if m and valid_email(m.group(1)): return m.group(1).strip()
+    for e in EMAIL_RE.findall(src):
+        if valid_email(e): return e
+    return ""
+
+def needs_browser(src):
+    """Bot-challenge interstitials only - "enable javascript" is ordinary <noscript> text on plenty of real sites"""
+    low = src.lower()
+    return "just a moment" in low or "challenge-platform" in low or ("cloudflare" in low and "ray id" in low)
+
+async def fetch_email(client, url):
+    """Home + contact/about pages fetched concurrently -> email, "" if none, None if JS-gated"""
+    if not url.startswith("http"): url = "https://" + url
+    base = url.rstrip('/')
+    resps = await asyncio.gather(*(client.get(base + p) for p in ['','/contact','/contact-us','/about']), return_exceptions=True)
+    gated = False
+    for r in resps:
+        if isinstance(r, Exception): continue
+        if r.status_code in (403, 503) or needs_browser(r.text): gated = True; continue
+        if r.status_code >= 400: continue
+        em = find_email(r.text)
+        if em: return em
+    return None if gated else ""
+
+async def gather_emails(leads):
+    """{_id: email/""/None} for every lead's website, EMAIL_CONCURRENCY sites at a time"""
+    sem = asyncio.Semaphore(EMAIL_CONCURRENCY)
+    async with httpx.AsyncClient(http2=True, follow_redirects=True, timeout=8,
+                                 headers={"User-Agent": random.choice(USER_AGENTS)}) as client:
+        async def one(l):
+            async with sem:
+                try: return l["_id"], await fetch_email(client, l.get("Website",""))
+                except: return l["_id"], None
+        return dict(await asyncio.gather(*(one(l) for l in leads)))
+
+def run_async(coro):
+    """asyncio.run on a helper thread (a Jupyter cell already has a running loop)"""
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        return ex.submit(asyncio.run, coro).result()
+
 def get_email(driver, detail_url, website=""):
     try:
-        time.sleep(random.uniform(LISTING_DELAY, LISTING_DELAY+2))
-        driver.get(detail_url); time.sleep(2); src = driver.page_source
-        if "blocked" in src.lower() or ("cloudflare" in src.lower() and "ray id" in src.lower()):
+        driver.get(detail_url); wait_for(driver, ".business-info, .sales-info, #main-content, #cf-wrapper"); src = driver.page_source
+        if is_blocked(src):
             if website and is_valid_website(website): return get_email_from_site(driver, website)
             return "__BLOCKED__"
-        driver.execute_script("window.scrollTo(0,800)"); time.sleep(1); src = driver.page_source
-        m = re.search(r'href=["\']mailto:([^"\'<>?\s]+)', src, re.IGNORECASE)
+        driver.execute_script("window.scrollTo(0,800)"); wait_for(driver, "a[href^='mailto:']", 1); src = driver.page_source
+        m = MAILTO_RE.search(src)
         if m and valid_email(m.group(1)): return m.group(1).strip()
-        for e in re.findall(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', src):
+        for e in EMAIL_RE.findall(src):
             if valid_email(e): return e
         if website and is_valid_website(website): return get_email_from_site(driver, website)
     except: pass
     return ""
 
+def _cls(c): return f"contains(concat(' ', normalize-space(@class), ' '), ' {c} ')"
+
+# Compiled once - each listing is a handful of C-level XPath evaluations
+_X_RESULTS = lh.etree.XPath(f"//*[{_cls('result')}]")
+_X_NAME = lh.etree.XPath(f"string((.//*[{_cls('business-name')}]//span)[1])")
+_X_NAME_ANY = lh.etree.XPath(f"string((.//*[{_cls('business-name')}])[1])")
+_X_WEB = lh.etree.XPath(f"string((.//*[{_cls('track-visit-website')}])[1]/@href)")
+_X_PHONE = lh.etree.XPath(f"string((.//*[{_cls('phones')}])[1])")
+_X_STREET = lh.etree.XPath(f"string((.//*[{_cls('street-address')}])[1])")
+_X_LOCALITY = lh.etree.XPath(f"string((.//*[{_cls('locality')}])[1])")
+_X_LINK = lh.etree.XPath(f"string((.//*[{_cls('business-name')}])[1]/@href)")
+_X_CATS = lh.etree.XPath(f"string((.//*[{_cls('categories')}])[1])")
+
 def parse_listing(lst):
     """Parse listing - returns None if no valid website (filtered out)"""
     try:
-        nm = lst.select_one(".business-name span") or lst.select_one(".business-name")
-        name = nm.text.strip() if nm else ""
+        name = (_X_NAME(lst) or _X_NAME_ANY(lst)).strip()
         if not name: return None
-        web_el = lst.select_one(".track-visit-website")
-        web = web_el["href"] if web_el else ""
+        web = _X_WEB(lst)
         if not is_valid_website(web): return None
-        ph = lst.select_one(".phones"); phone = ph.text.strip() if ph else ""
-        st = lst.select_one(".street-address"); loc = lst.select_one(".locality")
-        addr = " ".join(filter(None, [st.text.strip() if st else "", loc.text.strip() if loc else ""]))
-        det = lst.select_one(".business-name"); link = "https://www.yellowpages.com" + det["href"] if det and det.get("href") else ""
-        cat = lst.select_one(".categories"); cats = cat.text.strip() if cat else ""
+        phone = _X_PHONE(lst).strip()
+        addr = " ".join(filter(None, [_X_STREET(lst).strip(), _X_LOCALITY(lst).strip()]))
+        href = _X_LINK(lst); link = "https://www.yellowpages.com" + href if href else ""
+        cats = _X_CATS(lst).strip()
         return {"#":None,"Company Name":name,"Niche":NICHE_LABEL,"Category":cats,
                 "Email":"","Phone":phone,"Website":web,"Address":addr,"Date Added":datetime.now().strftime("%m/%d/%y"),
                 "Source":link,"Status":"","Notes":"","_id":gen_id(name,phone)}
     except: return None
 
 def get_page_listings(driver):
-    driver.execute_script("window.scrollTo(0,document.body.scrollHeight)"); time.sleep(2)
-    try: WebDriverWait(driver,10).until(EC.presence_of_element_located((By.CSS_SELECTOR,".result")))
-    except: return []
-    data = []
-    for el in driver.find_elements(By.CSS_SELECTOR, ".result"):
-        try:
-            p = parse_listing(BeautifulSoup(el.get_attribute("outerHTML"), "html.parser"))
-            if p: data.append(p)
-        except: pass
-    return data
-
-def save_xlsx(leads, path):
-    if not leads: return
-    clean = [{k:v for k,v in l.items() if not k.startswith("_")} for l in leads if is_valid_website(l.get("Website",""))]
-    if not clean: return
-    for i,l in enumerate(clean,1): l["#"] = i
-    df = pd.DataFrame(clean); df.to_excel(path, index=False)
-    try:
-        wb = load_workbook(path); ws = wb.active
-        dv = DataValidation(type="list", formula1='"Not Contacted,Contacted,Interested,Not Interested,Closed Won,Closed Lost"')
-        ws.add_data_validation(dv)
-        for c in ws[1]:
-            if c.value == "Status":
-                for r in range(2, ws.max_row+1):
-                    cell = ws.cell(r, c.column)
-                    if not cell.value: cell.value = "Not Contacted"
-                    dv.add(cell)
-        wb.save(path)
-    except: pass
+    driver.execute_script("window.scrollTo(0,document.body.scrollHeight)")
+    if not wait_for_results(driver): return []
+    return parse_results(driver.page_source)
+
+def parse_results(src):
+    # One lxml parse of the whole page - no per-result outerHTML round trips
+    tree = lh.fromstring(src)
+    return [p for p in (parse_listing(el) for el in _X_RESULTS(tree)) if p]
+
+def create_results_client():
+    """Keep-alive HTTP/2 client for results pages (plain HTML unless Cloudflare steps in)"""
+    return httpx.Client(http2=True, follow_redirects=True, timeout=15,
+                        limits=httpx.Limits(max_keepalive_connections=8, keepalive_expiry=60),
+                        headers={"User-Agent": random.choice(USER_AGENTS)})
+
+def fetch_results_html(client, url):
+    """Results page HTML over HTTP; None = challenge/error, load it in Chrome instead"""
+    try: r = client.get(url)
+    except: return None
+    low = r.text.lower()
+    if r.status_code in (403, 429, 503) or "you have been blocked" in low or "just a moment" in low or ("cloudflare" in low and "ray id" in low):
+        return None
+    return r.text if r.status_code < 400 else ""
+
+def paced_fetch(client, url, limiter):
+    """Wait out the results-page delay, then fetch (runs on the prefetch thread)"""
+    limiter.wait()
+    return fetch_results_html(client, url)
+
+# Leads are kept column-wise (dict of lists) during a scrape and only become a DataFrame at save time
+LEAD_FIELDS = ("#","Company Name","Niche","Category","Email","Phone","Website","Address","Date Added","Source","Status","Notes","_id")
+
+def add_rows(cols, rows):
+    for r in rows:
+        for k, col in cols.items(): col.append(r.get(k, ""))
+
+def save_xlsx(cols, path):
+    if not cols["_id"]: return
+    df = pd.DataFrame(cols).drop(columns="_id")
+    df = df[valid_website_mask(df["Website"])]
+    if df.empty: return
+    df["#"] = range(1, len(df)+1)
+    df = df.fillna("")
+    df["Status"] = df["Status"].replace("", "Not Contacted")
+    # constant_memory flushes each row as it's written, so rows must go out in order
+    wb = xlsxwriter.Workbook(path, {"constant_memory": True})
+    ws = wb.add_worksheet()
+    ws.write_row(0, 0, list(df.columns))
+    for r, row in enumerate(df.itertuples(index=False, name=None), 1):
+        ws.write_row(r, 0, row)
+    col = df.columns.get_loc("Status")
+    ws.data_validation(1, col, len(df), col, {"validate": "list", "source": STATUS_OPTIONS})
+    wb.close()
+
+def _append_jsonl(path, lead):
+    with open(path, "a", encoding="utf-8") as f: f.write(json.dumps(lead) + "\n")
+
+def load_page_in_browser(driver, pg_url, limiter):
+    """Browser fallback for a results page; backs off and retries while YP blocks us (None = still blocked)"""
+    for attempt in range(BLOCK_RETRIES + 1):
+        driver.get(pg_url)
+        listings = get_page_listings(driver)
+        if listings or not is_blocked(driver.page_source): return listings
+        limiter.blocked()
+        if attempt < BLOCK_RETRIES:
+            print(f"  Blocked (backing off to {limiter.delay:.0f}s, retry {attempt+1}/{BLOCK_RETRIES})")
+            rotate_session(driver); limiter.wait()
+    return None
 
 def scrape(term, location, existing_ids):
     url = f"https://www.yellowpages.com/{location}/{term}"
     outfile = os.path.join(OUTPUT_DIR, f"yp_{NICHE_KEY}_{location}_{term}.xlsx")
-    existing = []
+    cols = {k: [] for k in LEAD_FIELDS}
     if os.path.exists(outfile):
         try:
-            df = pd.read_excel(outfile); existing = df.to_dict('records')
-            existing = [l for l in existing if is_valid_website(l.get("Website",""))]
-            for l in existing: l["_id"] = gen_id(l.get("Company Name",""), l.get("Phone",""))
+            df = pd.read_excel(outfile, engine=XLSX_ENGINE); df = df[valid_website_mask(df["Website"])]
+            ids = lead_ids(df["Company Name"], df["Phone"])
+            for c in df.columns: cols.setdefault(c, [])
+            for c, col in cols.items():
+                col.extend(ids if c == "_id" else df[c].tolist() if c in df else [""] * len(df))
+        except: cols = {k: [] for k in LEAD_FIELDS}
+    # Leads logged by a run that died before its final save
+    sidecar = outfile + ".jsonl"; recovered = []
+    if os.path.exists(sidecar):
+        try:
+            seen = set(cols["_id"])
+            with open(sidecar, encoding="utf-8") as f:
+                recovered = [l for l in map(json.loads, filter(str.strip, f)) if l["_id"] not in seen]
+            add_rows(cols, recovered)
+            print(f"Recovered {len(recovered)} unsaved leads from {sidecar}")
         except: pass
     print(f"\n{'='*60}\n{NICHE_LABEL}: {term} @ {location}\n{'='*60}")
     print(f"Filter: Only businesses with real websites (no blank/localsearch/yellowpages)")
-    driver = create_driver(); leads = list(existing); local_ids = {l["_id"] for l in leads}; new_ct = 0; blocks = 0
+    # One set for run-wide + this file's IDs: a single probe per listing
+    ids = set(existing_ids); ids.update(cols["_id"])
+    driver = create_driver(); new_ids = {l["_id"] for l in recovered}; dirty = bool(recovered); new_ct = 0; blocks = 0
+    limiter, page_limiter = get_limiter("detail"), get_limiter("page")
+    page_url = lambda pg: url if pg==1 else f"{url}?page={pg}"
+    # Page N+1 is fetched over HTTP in the background (after its PAGE_DELAY wait) while page N's emails are looked up
+    client = create_results_client(); prefetch = ThreadPoolExecutor(max_workers=1)
+    next_html = prefetch.submit(fetch_results_html, client, page_url(1))
     try:
         for pg in range(1, MAX_PAGES+1):
-            pg_url = url if pg==1 else f"{url}?page={pg}"
+            pg_url = page_url(pg)
+            if pg > 1 and not rotate_session(driver):
+                print("  Browser session lost, restarting...")
+                try: driver.quit()
+                except: pass
+                driver = create_driver()
             print(f"[Page {pg}] {pg_url}")
-            try: driver.get(pg_url); time.sleep(2)
-            except: continue
-            listings = get_page_listings(driver)
+            # Paced read-ahead if one is in flight, otherwise wait + fetch now
+            html = next_html.result() if next_html else paced_fetch(client, pg_url, page_limiter)
+            next_html = None
+            if html is not None:
+                # Only read ahead while HTTP gets through - a challenged page is retried in Chrome first
+                if pg < MAX_PAGES: next_html = prefetch.submit(paced_fetch, client, page_url(pg+1), page_limiter)
+                listings = parse_results(html) if html else []
+            else:
+                print("  HTTP challenged, loading in browser")
+                try: listings = load_page_in_browser(driver, pg_url, page_limiter)
+                except: continue
+                if listings is None: print(f"  Still blocked after {BLOCK_RETRIES} retries, ending this search"); break
             if not listings: print("  No results with valid websites"); break
-            new_lst = [l for l in listings if l["_id"] not in existing_ids and l["_id"] not in local_ids]
-            for l in new_lst: local_ids.add(l["_id"])
+            page_limiter.ok()
+            new_lst = []
+            for l in listings:
+                if l["_id"] in ids: continue
+                ids.add(l["_id"]); new_lst.append(l)
             print(f"  Found {len(listings)} with real websites, {len(new_lst)} new")
             if not new_lst: continue
             if FETCH_EMAILS:
+                print(f"  Checking {len(new_lst)} websites over HTTP...")
+                site_emails = run_async(gather_emails(new_lst))
                 for i,l in enumerate(new_lst):
                     print(f"  [{i+1}/{len(new_lst)}] {l['Company Name'][:35]:35}", end="", flush=True)
-                    em = get_email(driver, l["Source"], l.get("Website",""))
+                    em = site_emails.get(l["_id"])
+                    # Site had no email - still check the YP page; only JS-gated sites go back to Chrome
+                    if not em:
+                        limiter.wait()
+                        em = get_email(driver, l["Source"], l.get("Website","") if em is None else "")
+                        if em == "__BLOCKED__": limiter.blocked()
+                        else: limiter.ok()
                     if em == "__BLOCKED__": print(" BLOCKED"); blocks += 1
                     elif em: l["Email"] = em; print(f" -> {em}")
                     else: print(" (no email)")
                     if blocks >= 5:
                         print("  Restarting browser..."); driver.quit(); time.sleep(5); driver = create_driver(); blocks = 0
-            leads.extend(new_lst); new_ct += len(new_lst)
-            save_xlsx(leads, outfile); print(f"  Saved {len(leads)} to {outfile}")
-            if pg < MAX_PAGES:
-                print("  Restarting browser..."); driver.quit(); time.sleep(3); driver = create_driver()
-                time.sleep(random.uniform(PAGE_DELAY, PAGE_DELAY+5))
+            add_rows(cols, new_lst); new_ct += len(new_lst); new_ids.update(l["_id"] for l in new_lst)
+            for l in new_lst: _append_jsonl(sidecar, l)
+            dirty = True
+            print(f"  Logged {len(new_lst)} new leads ({len(cols['_id'])} total)")
     except Exception as e: print(f"Error: {e}")
     finally:
         try: driver.quit()
         except: pass
-    print(f"Done: {new_ct} new leads (all with real websites), {len(leads)} total")
-    return leads, new_ct
+        prefetch.shutdown(wait=False, cancel_futures=True); client.close()
+        # xlsx is only written once per search; the sidecar covers crashes until then
+        if dirty:
+            save_xlsx(cols, outfile); print(f"  Saved {len(cols['_id'])} to {outfile}")
+            try: os.remove(sidecar)
+            except: pass
+    print(f"Done: {new_ct} new leads (all with real websites), {len(cols['_id'])} total")
+    return cols, new_ct, new_ids
+
+def scrape_job(term, loc, existing_ids):
+    time.sleep(random.uniform(15, 30))  # Per-worker pacing between searches
+    return scrape(term, loc, existing_ids)
 
 # ============== RUN ==============
 ensure_dir()
@@ -260,11 +466,13 @@ print(f"NOTE: Only scraping businesses with real websites (filtering out blank/l
 
 if RUN_ALL:
     total = 0
-    for ti, term in enumerate(SEARCH_TERMS):
-        for li, loc in enumerate(LOCATIONS):
-            _, n = scrape(term, loc, all_ids)
-            total += n; all_ids = load_all_ids()
-            time.sleep(random.uniform(15, 30))
+    # Each worker runs its own Chrome; the main thread merges the ID deltas they return
+    with ThreadPoolExecutor(max_workers=NUM_WORKERS) as ex:
+        futures = [ex.submit(scrape_job, t, l, all_ids) for t in SEARCH_TERMS for l in LOCATIONS]
+        for f in as_completed(futures):
+            try: _, n, new_ids = f.result()
+            except Exception as e: print(f"Worker error: {e}"); continue
+            total += n; all_ids |= new_ids  # load_all_ids() is only the cold-start bootstrap
     print(f"\n{'='*60}\nALL DONE! {total} new leads (all with real websites)\n{'='*60}")
 else:
     scrape(SEARCH_TERMS[CURRENT_TERM_INDEX], LOCATIONS[CURRENT_LOCATION_INDEX], all_ids)
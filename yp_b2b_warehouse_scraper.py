@@ -37,6 +37,11 @@ from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 from bs4 import BeautifulSoup
 import pandas as pd
+try:
+    import python_calamine
+    XLSX_ENGINE = "calamine"  # Rust xlsx reader, much faster than openpyxl
+except ImportError:
+    XLSX_ENGINE = "openpyxl"
 from openpyxl import load_workbook
 from openpyxl.worksheet.datavalidation import DataValidation
 
@@ -48,6 +53,7 @@ from openpyxl.worksheet.datavalidation import DataValidation
 # "single"    - Run one search term + one location
 # "niche"     - Run one NICHE (all its search terms) across all locations
 # "all"       - Run everything (comprehensive)
+# "merge"     - Merge all exports, then export hot leads + print stats
 MODE = "single"
 
 # === FOCUSED B2B NICHES ===
@@ -899,6 +905,15 @@ def run_all_niches():
 #                           UTILITIES
 # ============================================================================
 
+def read_export(path):
+    """Read one export file for merging (None if unreadable)"""
+    try:
+        return pd.read_excel(path, engine=XLSX_ENGINE)
+    except Exception as e:
+        print(f"  Error reading {path}: {e}")
+        return None
+
+
 def merge_all_files():
     """Merge all files into master list"""
     import glob
@@ -913,42 +928,40 @@ def merge_all_files():
 
     print(f"Merging {len(files)} files...")
 
-    all_leads = []
-    for f in files:
-        try:
-            df = pd.read_excel(f)
-            all_leads.extend(df.to_dict('records'))
-        except Exception as e:
-            print(f"  Error reading {f}: {e}")
+    dfs = [df for df in map(read_export, files) if df is not None]
 
-    if not all_leads:
+    if not dfs:
         print("No leads found!")
         return None
 
-    # Dedupe
-    seen = set()
-    unique = []
-    for lead in all_leads:
-        key = generate_lead_id(str(lead.get("Company Name", "")), str(lead.get("Phone Number", "")))
-        if key not in seen:
-            seen.add(key)
-            unique.append(lead)
+    merged = pd.concat(dfs, ignore_index=True)
+    if merged.empty:
+        print("No leads found!")
+        return None
 
-    for i, lead in enumerate(unique, 1):
-        lead["#"] = i
+    def column(d, name):
+        """Older or hand-edited files may lack a column - treat it as blank"""
+        return d[name] if name in d else pd.Series("", index=d.index, dtype=str)
+
+    # Dedupe on the same name|phone key generate_lead_id uses, without hashing each row
+    keys = pd.DataFrame({
+        "name": column(merged, "Company Name").fillna("").astype(str).str.lower().str.strip(),
+        "phone": column(merged, "Phone Number").fillna("").astype(str).str.strip(),
+    })
+    df = merged[~keys.duplicated(keep="first")].reset_index(drop=True)
+    df["#"] = range(1, len(df) + 1)
 
     output_path = os.path.join(OUTPUT_DIR, "ALL_LEADS_MERGED.xlsx")
-    df = pd.DataFrame(unique)
     df.to_excel(output_path, index=False)
     add_checkboxes(output_path)
 
-    email_count = sum(1 for l in unique if l.get("Email Address"))
-    website_count = sum(1 for l in unique if l.get("Has Website") == "Yes")
+    email_count = (column(df, "Email Address").fillna("") != "").sum()
+    website_count = (column(df, "Has Website") == "Yes").sum()
 
     print(f"\n{'='*70}")
     print(f"MERGE COMPLETE!")
     print(f"Files merged: {len(files)}")
-    print(f"Total unique leads: {len(unique)}")
+    print(f"Total unique leads: {len(df)}")
     print(f"With emails: {email_count}")
     print(f"With websites: {website_count}")
     print(f"Saved to: {output_path}")
@@ -957,18 +970,19 @@ def merge_all_files():
     return df
 
 
-def export_hot_leads():
+def export_hot_leads(df=None):
     """Export leads that have BOTH email AND website (hottest leads)"""
-    merged_path = os.path.join(OUTPUT_DIR, "ALL_LEADS_MERGED.xlsx")
+    if df is None:
+        merged_path = os.path.join(OUTPUT_DIR, "ALL_LEADS_MERGED.xlsx")
 
-    if not os.path.exists(merged_path):
-        print("Run merge_all_files() first!")
-        return None
+        if not os.path.exists(merged_path):
+            print("Run merge_all_files() first!")
+            return None
 
-    df = pd.read_excel(merged_path)
+        df = pd.read_excel(merged_path)
 
     # Hot leads: have email
-    hot = df[df["Email Address"].notna() & (df["Email Address"] != "")]
+    hot = df[df["Email Address"].fillna("").astype(str).str.len().gt(0)]
     hot = hot.copy()
     hot["#"] = range(1, len(hot) + 1)
 
@@ -1015,15 +1029,16 @@ def export_by_niche():
         print(f"  {niche}: {len(niche_df)} leads ({email_ct} with email) -> {output_path}")
 
 
-def print_stats():
+def print_stats(df=None):
     """Show statistics"""
-    merged_path = os.path.join(OUTPUT_DIR, "ALL_LEADS_MERGED.xlsx")
+    if df is None:
+        merged_path = os.path.join(OUTPUT_DIR, "ALL_LEADS_MERGED.xlsx")
 
-    if not os.path.exists(merged_path):
-        print("Run merge_all_files() first!")
-        return
+        if not os.path.exists(merged_path):
+            print("Run merge_all_files() first!")
+            return
 
-    df = pd.read_excel(merged_path)
+        df = pd.read_excel(merged_path)
 
     print(f"\n{'='*70}")
     print("LEAD STATISTICS")
@@ -1075,6 +1090,12 @@ if __name__ == "__main__":
         run_niche_search()
     elif MODE == "all":
         run_all_niches()
+    elif MODE == "merge":
+        # Reuse the merged DataFrame instead of re-reading ALL_LEADS_MERGED.xlsx
+        merged = merge_all_files()
+        if merged is not None:
+            export_hot_leads(merged)
+            print_stats(merged)
     else:
         print(f"Unknown mode: {MODE}")
-        print("Valid: single, niche, all")
+        print("Valid: single, niche, all, merge")